@@ -60,7 +60,8 @@ class Command:
     """
     @staticmethod
     def run(
-        command, custom_env=None, raise_on_error=True, stderr_to_stdout=False
+        command, custom_env=None, raise_on_error=True, stderr_to_stdout=False,
+        stdin=None
     ):
         """
         Execute a program and block the caller. The return value
@@ -79,6 +80,7 @@ class Command:
         :param list custom_env: custom os.environ
         :param bool raise_on_error: control error behaviour
         :param bool stderr_to_stdout: redirects stderr to stdout
+        :param str stdin: data to pass to the command on stdin
 
         :return:
             Contains call results in command type
@@ -111,6 +113,7 @@ class Command:
         try:
             process = subprocess.Popen(
                 command,
+                stdin=subprocess.PIPE if stdin else None,
                 stdout=subprocess.PIPE,
                 stderr=stderr,
                 env=environment
@@ -119,7 +122,9 @@ class Command:
             raise KiwiCommandError(
                 '%s: %s: %s' % (command[0], type(e).__name__, format(e))
             )
-        output, error = process.communicate()
+        output, error = process.communicate(
+            stdin.encode() if stdin else None
+        )
         if process.returncode != 0 and raise_on_error:
             if not error:
                 error = bytes(b'(no output on stderr)')
@@ -16,7 +16,7 @@
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
 from typing import (
-    List, Dict, Union
+    List, Mapping, Union
 )
 
 # project
@@ -48,7 +48,7 @@ class PartitionerBase:
         self.start_sector = start_sector
         self.extended_layout = extended_layout
 
-        self.flag_map: Dict[str, Union[bool, str, None]] = {}
+        self.flag_map: Mapping[str, Union[bool, str, None]] = {}
 
         self.post_init()
 
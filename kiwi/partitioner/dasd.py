@@ -19,7 +19,6 @@ import logging
 from typing import List
 
 # project
-from kiwi.utils.temporary import Temporary
 from kiwi.command import Command
 from kiwi.partitioner.base import PartitionerBase
 
@@ -58,22 +57,17 @@ class PartitionerDasd(PartitionerBase):
         :param list flags: unused
         """
         self.partition_id += 1
-        fdasd_input = Temporary().new_file()
-        with open(fdasd_input.name, 'w') as partition:
-            log.debug(
-                '%s: fdasd: n p cur_position +%sM w q',
-                name, format(mbsize)
-            )
-            if mbsize == 'all_free':
-                partition.write('n\np\n\n\nw\nq\n')
-            else:
-                partition.write(f'n\np\n\n+{mbsize}M\nw\nq\n')
-        bash_command = ' '.join(
-            ['cat', fdasd_input.name, '|', 'fdasd', '-f', self.disk_device]
+        log.debug(
+            '%s: fdasd: n p cur_position +%sM w q',
+            name, format(mbsize)
         )
+        if mbsize == 'all_free':
+            fdasd_input = 'n\np\n\n\nw\nq\n'
+        else:
+            fdasd_input = f'n\np\n\n+{mbsize}M\nw\nq\n'
         try:
             Command.run(
-                ['bash', '-c', bash_command]
+                ['fdasd', '-f', self.disk_device], stdin=fdasd_input
             )
         except Exception:
             # unfortunately fdasd reports that it can't read in the partition
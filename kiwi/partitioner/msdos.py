@@ -15,15 +15,19 @@
 # You should have received a copy of the GNU General Public License
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
+import re
 import logging
-from typing import List
+from types import MappingProxyType
+from typing import (
+    List, Tuple, Union
+)
 
 # project
-from kiwi.utils.temporary import Temporary
 from kiwi.command import Command
 from kiwi.partitioner.base import PartitionerBase
 
 from kiwi.exceptions import (
+    KiwiCommandError,
     KiwiPartitionerMsDosFlagError
 )
 
@@ -34,13 +38,10 @@ class PartitionerMsDos(PartitionerBase):
     """
     **Implement old style msdos partition setup**
     """
-    def post_init(self) -> None:
-        """
-        Post initialization method
-
-        Setup sfdisk partition type/flag map
-        """
-        self.flag_map = {
+    #: sfdisk partition type/flag map, immutable and shared
+    #: across all partitioner instances
+    _flag_map = MappingProxyType(
+        {
             'f.active': True,
             't.linux': '83',
             't.swap': '82',
@@ -51,6 +52,34 @@ class PartitionerMsDos(PartitionerBase):
             't.prep': '41',
             't.extended': '5'
         }
+    )
+
+    #: create() dispatch table for extended layouts. Maps the current
+    #: partition count, capped at the primary boundary, to the
+    #: declaration methods to apply: below the boundary partitions
+    #: stay primary, at the boundary an extended plus a first logical
+    #: partition is declared, beyond it only logical partitions follow
+    _create_dispatch = MappingProxyType(
+        {
+            0: ['_create_primary'],
+            1: ['_create_primary'],
+            2: ['_create_primary'],
+            3: ['_create_extended', '_create_logical'],
+            4: ['_create_logical']
+        }
+    )
+
+    def post_init(self) -> None:
+        """
+        Post initialization method
+
+        Setup sfdisk partition type/flag map
+        """
+        self.flag_map = self._flag_map
+        self._sfdisk_script: List[str] = []
+        self._pending_flags: List[Tuple[int, str]] = []
+        self._active_partitions: List[int] = []
+        self._table_initialized = False
 
     def create(
         self, name: str, mbsize: int, type_name: str, flags: List[str] = []
@@ -58,53 +87,74 @@ class PartitionerMsDos(PartitionerBase):
         """
         Create msdos partition
 
+        All partition declarations of this call, including the
+        extended/logical pair at the primary boundary, are applied
+        in a single sfdisk pass
+
         :param string name: partition name
         :param int mbsize: partition size
         :param string type_name: partition type
         :param list flags: additional flags
         """
-        if self.extended_layout:
-            if self.partition_id < 3:
-                # in primary boundary
-                self._create_primary(name, mbsize, type_name, flags)
-            elif self.partition_id == 3:
-                # at primary boundary, create extended + logical
-                self._create_extended(name)
-                self._create_logical(name, mbsize, type_name, flags)
-            elif self.partition_id > 3:
-                # in logical boundary
-                self._create_logical(name, mbsize, type_name, flags)
-        else:
-            self._create_primary(name, mbsize, type_name, flags)
+        dispatch_key = \
+            min(self.partition_id, 4) if self.extended_layout else 0
+        for method_name in self._create_dispatch[dispatch_key]:
+            getattr(self, method_name)(name, mbsize, type_name, flags)
+        self._flush_sfdisk()
 
     def set_flag(self, partition_id: int, flag_name: str) -> None:
         """
         Set msdos partition flag
 
+        The flag change is recorded as pending and committed
+        together with any other pending flag changes right away
+
         :param int partition_id: partition number
         :param string flag_name: name from flag map
         """
-        if flag_name not in self.flag_map:
+        try:
+            flag_value = self.flag_map[flag_name]
+        except KeyError:
             raise KiwiPartitionerMsDosFlagError(
                 'Unknown partition flag %s' % flag_name
             )
-        if self.flag_map[flag_name]:
+        if flag_value:
+            self._pending_flags.append((partition_id, flag_name))
+            self.commit()
+        else:
+            log.warning('Flag %s ignored on msdos', flag_name)
+
+    def commit(self) -> None:
+        """
+        Apply all pending partition flag changes
+
+        Partition activations are coalesced into a single sfdisk
+        call instead of one process call per partition. Since
+        sfdisk --activate turns the bootable flag off on every
+        partition not listed, the call always passes all
+        partitions activated so far
+        """
+        activate_requested = False
+        for partition_id, flag_name in self._pending_flags:
             if flag_name == 'f.active':
-                Command.run(
-                    [
-                        'parted', self.disk_device,
-                        'set', format(partition_id), 'boot', 'on'
-                    ]
-                )
+                if partition_id not in self._active_partitions:
+                    self._active_partitions.append(partition_id)
+                activate_requested = True
             else:
                 Command.run(
                     [
-                        'sfdisk', '-c', self.disk_device,
-                        format(partition_id), self.flag_map[flag_name]
+                        'sfdisk', '--part-type', self.disk_device,
+                        f'{partition_id}', self.flag_map[flag_name]
                     ]
                 )
-        else:
-            log.warning('Flag %s ignored on msdos', flag_name)
+        self._pending_flags = []
+        if activate_requested:
+            Command.run(
+                ['sfdisk', '--activate', self.disk_device] + [
+                    f'{partition_id}'
+                    for partition_id in self._active_partitions
+                ]
+            )
 
     def resize_table(self, entries: int = None) -> None:
         """
@@ -120,88 +170,134 @@ class PartitionerMsDos(PartitionerBase):
         self, name: str, mbsize: int, type_name: str, flags: List[str] = []
     ) -> None:
         """
-        Create primary msdos partition
+        Declare primary msdos partition
         """
         self.partition_id += 1
-        fdisk_input = Temporary().new_file()
         if self.partition_id > 1:
-            # Undefined start sector value skips this for fdisk and
+            # Undefined start sector value skips this for sfdisk and
             # use its default value
             self.start_sector = None
-        with open(fdisk_input.name, 'w') as partition:
-            log.debug(
-                '%s: fdisk: n p %d cur_position +%sM w q',
-                name, self.partition_id, format(mbsize)
-            )
-            partition.write(
-                'n\np\n{0}\n{1}\n{2}\nw\nq\n'.format(
-                    self.partition_id,
-                    '' if not self.start_sector else self.start_sector,
-                    '' if mbsize == 'all_free' else '+{0}M'.format(mbsize)
-                )
-            )
-        self._call_fdisk(fdisk_input.name)
-        self._set_all_flags(type_name, flags)
+        log.debug(
+            '%s: sfdisk: primary id %d size +%sM',
+            name, self.partition_id, mbsize
+        )
+        self._sfdisk_script.append(
+            self._sfdisk_partition_entry(mbsize, type_name, flags)
+        )
 
-    def _create_extended(self, name: str) -> None:
+    def _create_extended(
+        self, name: str, mbsize: int, type_name: str,
+        flags: List[str] = []
+    ) -> None:
         """
-        Create extended msdos partition
+        Declare extended msdos partition
+
+        The extended partition always spans the rest of the disk,
+        the mbsize, type_name and flags values are unused and exist
+        to match the create dispatch signature
         """
         self.partition_id += 1
-        fdisk_input = Temporary().new_file()
-        with open(fdisk_input.name, 'w') as partition:
-            log.debug(
-                '%s: fdisk: n e %d cur_position +all_freeM w q',
-                name, self.partition_id
-            )
-            partition.write(
-                'n\ne\n{0}\n{1}\n{2}\nw\nq\n'.format(
-                    self.partition_id, '', ''
-                )
-            )
-        self._call_fdisk(fdisk_input.name)
+        log.debug(
+            '%s: sfdisk: extended id %d size +all_freeM',
+            name, self.partition_id
+        )
+        self._sfdisk_script.append(
+            self._sfdisk_partition_entry('all_free', 't.extended')
+        )
 
     def _create_logical(
         self, name: str, mbsize: int, type_name: str, flags: List[str] = []
     ) -> None:
         """
-        Create logical msdos partition
+        Declare logical msdos partition
         """
         self.partition_id += 1
-        fdisk_input = Temporary().new_file()
-        with open(fdisk_input.name, 'w') as partition:
-            log.debug(
-                '%s: fdisk: n %d cur_position +%sM w q',
-                name, self.partition_id, format(mbsize)
-            )
-            partition.write(
-                'n\n{0}\n{1}\n{2}\nw\nq\n'.format(
-                    self.partition_id,
-                    '',
-                    '' if mbsize == 'all_free' else '+{0}M'.format(mbsize)
-                )
-            )
-        self._call_fdisk(fdisk_input.name)
-        self._set_all_flags(type_name, flags)
-
-    def _set_all_flags(self, type_name: str, flags: List[str]) -> None:
-        self.set_flag(self.partition_id, type_name)
-        if flags:
-            for flag_name in flags:
-                self.set_flag(self.partition_id, flag_name)
-
-    def _call_fdisk(self, fdisk_config_file_path: str) -> None:
-        bash_command = ' '.join(
-            ['cat', fdisk_config_file_path, '|', 'fdisk', self.disk_device]
+        log.debug(
+            '%s: sfdisk: logical id %d size +%sM',
+            name, self.partition_id, mbsize
+        )
+        self._sfdisk_script.append(
+            self._sfdisk_partition_entry(mbsize, type_name, flags)
         )
+
+    def _sfdisk_partition_entry(
+        self, mbsize: Union[int, str], type_name: str, flags: List[str] = []
+    ) -> str:
+        """
+        Build one declarative sfdisk script line
+
+        The partition type and all flags are folded into the
+        same line such that no separate process call per flag
+        is needed after the partition got created
+
+        :param mbsize: partition size or 'all_free'
+        :type mbsize: int, str
+        :param string type_name: partition type
+        :param list flags: additional flags
+
+        :return: sfdisk script line
+
+        :rtype: str
+        """
+        entry = []
+        if self.start_sector:
+            entry.append(f'start={self.start_sector}')
+        if mbsize != 'all_free':
+            entry.append(f'size={mbsize}MiB')
+        for flag_name in [type_name] + flags:
+            try:
+                flag_value = self.flag_map[flag_name]
+            except KeyError:
+                raise KiwiPartitionerMsDosFlagError(
+                    'Unknown partition flag %s' % flag_name
+                )
+            if flag_value:
+                if flag_name == 'f.active':
+                    entry.append('bootable')
+                    if self.partition_id not in self._active_partitions:
+                        self._active_partitions.append(self.partition_id)
+                else:
+                    entry.append(f'type={flag_value}')
+            else:
+                log.warning('Flag %s ignored on msdos', flag_name)
+        return ', '.join(entry)
+
+    def _flush_sfdisk(self) -> None:
+        """
+        Apply pending partition entries in one sfdisk call
+
+        The first flush writes a new DOS label along with the
+        partition entries since the disk starts out blank after
+        Disk.wipe and sfdisk refuses to add partitions without a
+        label. Subsequent flushes append to the created table.
+
+        sfdisk can exit non zero solely because the kernel refused to
+        re-read the partition table, e.g on busy loop devices. In this
+        case the table itself got written correctly and the operation
+        continues. Any other sfdisk error is raised
+        """
+        if not self._sfdisk_script:
+            return
+        sfdisk_call = ['sfdisk', '--no-reread', '--no-tell-kernel']
+        if self._table_initialized:
+            sfdisk_call.append('--append')
+        else:
+            self._sfdisk_script.insert(0, 'label: dos')
+            self._table_initialized = True
+        sfdisk_script = '\n'.join(self._sfdisk_script) + '\n'
+        self._sfdisk_script = []
         try:
             Command.run(
-                ['bash', '-c', bash_command]
+                sfdisk_call + [self.disk_device], stdin=sfdisk_script
             )
-        except Exception:
-            # unfortunately fdisk reports that it can't read in the partition
-            # table which I consider a bug in fdisk. However the table was
-            # correctly created and therefore we continue. Problem is that we
-            # are not able to detect real errors with the fdisk operation at
-            # that point.
-            log.debug('potential fdisk errors were ignored')
+        except KiwiCommandError as issue:
+            if re.search(
+                'Re-reading the partition table failed|BLKRRPART', format(issue)
+            ):
+                log.debug(
+                    'sfdisk partition table re-read failure ignored: {0}'.format(
+                        issue
+                    )
+                )
+            else:
+                raise
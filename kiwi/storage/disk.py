@@ -23,7 +23,6 @@ from typing import (
 )
 
 # project
-from kiwi.utils.temporary import Temporary
 from kiwi.command import Command
 from kiwi.storage.device_provider import DeviceProvider
 from kiwi.storage.mapped_device import MappedDevice
@@ -355,18 +354,11 @@ class Disk(DeviceProvider):
         """
         if 'dasd' in self.table_type:
             log.debug('Initialize DASD disk with new VTOC table')
-            fdasd_input = Temporary().new_file()
-            with open(fdasd_input.name, 'w') as vtoc:
-                vtoc.write('y\n\nw\nq\n')
-            bash_command = ' '.join(
-                [
-                    'cat', fdasd_input.name, '|',
-                    'fdasd', '-f', self.storage_provider.get_device()
-                ]
-            )
             try:
                 Command.run(
-                    ['bash', '-c', bash_command]
+                    [
+                        'fdasd', '-f', self.storage_provider.get_device()
+                    ], stdin='y\n\nw\nq\n'
                 )
             except Exception:
                 # unfortunately fdasd reports that it can't read in the
@@ -16,11 +16,10 @@
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
 import json
-import os
 import logging
+import subprocess
 
 # project
-from kiwi.utils.temporary import Temporary
 from kiwi.path import Path
 
 log = logging.getLogger('kiwi')
@@ -87,10 +86,9 @@ class DataOutput:
         """
         Show data in json output format with nice color highlighting
         """
-        out_file = Temporary().new_file()
-        out_file.write(json.dumps(self.data, sort_keys=True).encode())
-        out_file.flush()
-        pjson_cmd = ''.join(
-            ['cat ', out_file.name, ' | pjson']
+        pjson = subprocess.Popen(
+            ['pjson'], stdin=subprocess.PIPE
+        )
+        pjson.communicate(
+            json.dumps(self.data, sort_keys=True).encode()
         )
-        os.system(pjson_cmd)
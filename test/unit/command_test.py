@@ -3,6 +3,7 @@ from collections import namedtuple
 from pytest import raises
 import mock
 import os
+import subprocess
 
 from kiwi.command import Command
 
@@ -82,6 +83,30 @@ class TestCommand:
         mock_access.return_value = True
         assert Command.run(['command', 'args']) == run_result
 
+    @patch('os.access')
+    @patch('os.path.exists')
+    @patch('subprocess.Popen')
+    def test_run_with_stdin(self, mock_popen, mock_exists, mock_access):
+        mock_exists.return_value = True
+        mock_process = mock.Mock()
+        mock_process.communicate = mock.Mock(
+            return_value=[str.encode('stdout'), str.encode('stderr')]
+        )
+        mock_process.returncode = 0
+        mock_popen.return_value = mock_process
+        mock_access.return_value = True
+        Command.run(['command', 'args'], stdin='data')
+        mock_popen.assert_called_once_with(
+            ['command', 'args'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=os.environ
+        )
+        mock_process.communicate.assert_called_once_with(
+            str.encode('data')
+        )
+
     def test_run_command_does_not_exist(self):
         with raises(KiwiCommandNotFound):
             Command.run(['does-not-exist'])
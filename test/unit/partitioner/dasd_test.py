@@ -1,8 +1,6 @@
 import logging
 from pytest import fixture
-from mock import (
-    patch, mock_open
-)
+from mock import patch
 
 import mock
 
@@ -14,14 +12,7 @@ class TestPartitionerDasd:
     def inject_fixtures(self, caplog):
         self._caplog = caplog
 
-    @patch('kiwi.partitioner.dasd.Command.run')
-    @patch('kiwi.partitioner.dasd.Temporary.new_file')
-    def setup(self, mock_temp, mock_command):
-        self.tempfile = mock.Mock()
-        self.tempfile.name = 'tempfile'
-
-        mock_temp.return_value = self.tempfile
-
+    def setup(self):
         disk_provider = mock.Mock()
         disk_provider.get_device = mock.Mock(
             return_value='/dev/loop0'
@@ -29,40 +20,23 @@ class TestPartitionerDasd:
 
         self.partitioner = PartitionerDasd(disk_provider)
 
-    @patch('kiwi.partitioner.dasd.Command.run')
-    @patch('kiwi.partitioner.dasd.Temporary.new_file')
-    def setup_method(self, cls, mock_temp, mock_command):
+    def setup_method(self, cls):
         self.setup()
 
     @patch('kiwi.partitioner.dasd.Command.run')
-    @patch('kiwi.partitioner.dasd.Temporary.new_file')
-    def test_create(self, mock_temp, mock_command):
+    def test_create(self, mock_command):
         mock_command.side_effect = Exception
-        mock_temp.return_value = self.tempfile
-
-        m_open = mock_open()
-        with patch('builtins.open', m_open, create=True):
-            with self._caplog.at_level(logging.DEBUG):
-                self.partitioner.create('name', '100', 't.linux', ['f.active'])
-
-        m_open.return_value.write.assert_called_once_with(
-            'n\np\n\n+100M\nw\nq\n'
-        )
+        with self._caplog.at_level(logging.DEBUG):
+            self.partitioner.create('name', '100', 't.linux', ['f.active'])
         mock_command.assert_called_once_with(
-            ['bash', '-c', 'cat tempfile | fdasd -f /dev/loop0']
+            ['fdasd', '-f', '/dev/loop0'], stdin='n\np\n\n+100M\nw\nq\n'
         )
 
     @patch('kiwi.partitioner.dasd.Command.run')
-    @patch('kiwi.partitioner.dasd.Temporary.new_file')
-    def test_create_all_free(self, mock_temp, mock_command):
-        mock_temp.return_value = self.tempfile
-
-        m_open = mock_open()
-        with patch('builtins.open', m_open, create=True):
-            self.partitioner.create('name', 'all_free', 't.linux')
-
-        m_open.return_value.write.assert_called_once_with(
-            'n\np\n\n\nw\nq\n'
+    def test_create_all_free(self, mock_command):
+        self.partitioner.create('name', 'all_free', 't.linux')
+        mock_command.assert_called_once_with(
+            ['fdasd', '-f', '/dev/loop0'], stdin='n\np\n\n\nw\nq\n'
         )
 
     def test_resize_table(self):
@@ -1,15 +1,17 @@
 import logging
 from mock import (
-    patch, call, mock_open, Mock
+    patch, call, Mock
 )
 from pytest import (
     raises, fixture
 )
-from collections import namedtuple
 
 from kiwi.partitioner.msdos import PartitionerMsDos
 
-from kiwi.exceptions import KiwiPartitionerMsDosFlagError
+from kiwi.exceptions import (
+    KiwiCommandError,
+    KiwiPartitionerMsDosFlagError
+)
 
 
 class TestPartitionerMsDos:
@@ -31,89 +33,60 @@ class TestPartitionerMsDos:
         self.setup()
 
     @patch('kiwi.partitioner.msdos.Command.run')
-    @patch('kiwi.partitioner.msdos.PartitionerMsDos.set_flag')
-    @patch('kiwi.partitioner.msdos.Temporary.new_file')
-    def test_create_primary(self, mock_temp, mock_flag, mock_command):
-        mock_command.side_effect = Exception
-        temp_type = namedtuple(
-            'temp_type', ['name']
-        )
-        mock_temp.return_value = temp_type(
-            name='tempfile'
-        )
-        m_open = mock_open()
-
-        with patch('builtins.open', m_open, create=True):
-            self.partitioner._create_primary(
-                'name', 100, 't.linux', ['f.active']
-            )
-
-        m_open.return_value.write.assert_called_once_with(
-            'n\np\n1\n\n+100M\nw\nq\n'
+    def test_create_primary(self, mock_command):
+        self.partitioner.create(
+            'name', 100, 't.linux', ['f.active']
         )
         mock_command.assert_called_once_with(
-            ['bash', '-c', 'cat tempfile | fdisk /dev/loop0']
+            [
+                'sfdisk', '--no-reread', '--no-tell-kernel',
+                '/dev/loop0'
+            ], stdin='label: dos\nsize=100MiB, type=83, bootable\n'
         )
-        call = mock_flag.call_args_list[0]
-        assert mock_flag.call_args_list[0] == \
-            call(1, 't.linux')
-        call = mock_flag.call_args_list[1]
-        assert mock_flag.call_args_list[1] == \
-            call(1, 'f.active')
 
     @patch('kiwi.partitioner.msdos.Command.run')
-    @patch('kiwi.partitioner.msdos.PartitionerMsDos.set_flag')
-    @patch('kiwi.partitioner.msdos.Temporary.new_file')
-    def test_create_extended(self, mock_temp, mock_flag, mock_command):
-        mock_command.side_effect = Exception
-        temp_type = namedtuple(
-            'temp_type', ['name']
+    def test_create_extended_and_logical(self, mock_command):
+        self.partitioner_extended.partition_id = 3
+        self.partitioner_extended._table_initialized = True
+        self.partitioner_extended.create(
+            'name', 100, 't.linux', ['f.active']
         )
-        mock_temp.return_value = temp_type(
-            name='tempfile'
+        mock_command.assert_called_once_with(
+            [
+                'sfdisk', '--no-reread', '--no-tell-kernel', '--append',
+                '/dev/loop0'
+            ], stdin='type=5\nsize=100MiB, type=83, bootable\n'
         )
-        m_open = mock_open()
-
-        with patch('builtins.open', m_open, create=True):
-            self.partitioner._create_extended('name')
+        assert self.partitioner_extended.get_id() == 5
 
-        m_open.return_value.write.assert_called_once_with(
-            'n\ne\n1\n\n\nw\nq\n'
+    @patch('kiwi.partitioner.msdos.Command.run')
+    def test_create_logical(self, mock_command):
+        self.partitioner_extended.partition_id = 7
+        self.partitioner_extended._table_initialized = True
+        self.partitioner_extended.create(
+            'name', 100, 't.linux', ['f.active']
         )
         mock_command.assert_called_once_with(
-            ['bash', '-c', 'cat tempfile | fdisk /dev/loop0']
+            [
+                'sfdisk', '--no-reread', '--no-tell-kernel', '--append',
+                '/dev/loop0'
+            ], stdin='size=100MiB, type=83, bootable\n'
         )
 
     @patch('kiwi.partitioner.msdos.Command.run')
-    @patch('kiwi.partitioner.msdos.PartitionerMsDos.set_flag')
-    @patch('kiwi.partitioner.msdos.Temporary.new_file')
-    def test_create_logical(self, mock_temp, mock_flag, mock_command):
-        mock_command.side_effect = Exception
-        temp_type = namedtuple(
-            'temp_type', ['name']
+    def test_create_reread_failure_ignored(self, mock_command):
+        mock_command.side_effect = KiwiCommandError(
+            'Re-reading the partition table failed: Device or resource busy'
         )
-        mock_temp.return_value = temp_type(
-            name='tempfile'
-        )
-        m_open = mock_open()
-
-        with patch('builtins.open', m_open, create=True):
-            self.partitioner._create_logical(
-                'name', 100, 't.linux', ['f.active']
-            )
+        with self._caplog.at_level(logging.DEBUG):
+            self.partitioner.create('name', 100, 't.linux')
+        assert 'partition table re-read failure ignored' in self._caplog.text
 
-        m_open.return_value.write.assert_called_once_with(
-            'n\n1\n\n+100M\nw\nq\n'
-        )
-        mock_command.assert_called_once_with(
-            ['bash', '-c', 'cat tempfile | fdisk /dev/loop0']
-        )
-        call = mock_flag.call_args_list[0]
-        assert mock_flag.call_args_list[0] == \
-            call(1, 't.linux')
-        call = mock_flag.call_args_list[1]
-        assert mock_flag.call_args_list[1] == \
-            call(1, 'f.active')
+    @patch('kiwi.partitioner.msdos.Command.run')
+    def test_create_raises(self, mock_command):
+        mock_command.side_effect = KiwiCommandError('some error')
+        with raises(KiwiCommandError):
+            self.partitioner.create('name', 100, 't.linux')
 
     @patch.object(PartitionerMsDos, '_create_primary')
     @patch.object(PartitionerMsDos, '_create_extended')
@@ -132,7 +105,9 @@ class TestPartitionerMsDos:
         )
         self.partitioner_extended.partition_id = 3
         self.partitioner_extended.create('name', 100, 't.linux')
-        mock_create_extended.assert_called_once_with('name')
+        mock_create_extended.assert_called_once_with(
+            'name', 100, 't.linux', []
+        )
         mock_create_logical.assert_called_once_with(
             'name', 100, 't.linux', []
         )
@@ -144,64 +119,50 @@ class TestPartitionerMsDos:
         )
 
     @patch('kiwi.partitioner.msdos.Command.run')
-    @patch('kiwi.partitioner.msdos.PartitionerMsDos.set_flag')
-    @patch('kiwi.partitioner.msdos.Temporary.new_file')
-    def test_create_custom_start_sector(
-        self, mock_temp, mock_flag, mock_command
-    ):
+    def test_create_custom_start_sector(self, mock_command):
         disk_provider = Mock()
         disk_provider.get_device = Mock(
             return_value='/dev/loop0'
         )
         partitioner = PartitionerMsDos(disk_provider, 4096)
-        mock_command.side_effect = Exception
-        temp_type = namedtuple(
-            'temp_type', ['name']
-        )
-        mock_temp.return_value = temp_type(
-            name='tempfile'
-        )
-
-        m_open = mock_open()
-        with patch('builtins.open', m_open, create=True):
-            partitioner.create('name', 100, 't.linux', ['f.active'])
-            partitioner.create('name', 100, 't.linux', ['f.active'])
-
+        partitioner.create('name', 100, 't.linux', ['f.active'])
+        partitioner.create('name', 100, 't.linux', ['f.active'])
         mock_command.assert_has_calls([
-            call(['bash', '-c', 'cat tempfile | fdisk /dev/loop0']),
-            call(['bash', '-c', 'cat tempfile | fdisk /dev/loop0'])
-        ])
-        assert mock_flag.call_args_list[0] == \
-            call(1, 't.linux')
-        assert mock_flag.call_args_list[1] == \
-            call(1, 'f.active')
-
-        m_open.return_value.write.assert_has_calls([
-            call('n\np\n1\n4096\n+100M\nw\nq\n'),
-            call('n\np\n2\n\n+100M\nw\nq\n')
+            call(
+                [
+                    'sfdisk', '--no-reread', '--no-tell-kernel',
+                    '/dev/loop0'
+                ], stdin='label: dos\nstart=4096, size=100MiB, type=83, '
+                'bootable\n'
+            ),
+            call(
+                [
+                    'sfdisk', '--no-reread', '--no-tell-kernel', '--append',
+                    '/dev/loop0'
+                ], stdin='size=100MiB, type=83, bootable\n'
+            )
         ])
 
     @patch('kiwi.partitioner.msdos.Command.run')
-    @patch('kiwi.partitioner.msdos.PartitionerMsDos.set_flag')
-    @patch('kiwi.partitioner.msdos.Temporary.new_file')
-    def test_create_all_free(
-        self, mock_temp, mock_flag, mock_command
-    ):
-        mock_command.side_effect = Exception
-        temp_type = namedtuple(
-            'temp_type', ['name']
-        )
-        mock_temp.return_value = temp_type(
-            name='tempfile'
+    def test_create_all_free(self, mock_command):
+        self.partitioner.create('name', 'all_free', 't.linux')
+        mock_command.assert_called_once_with(
+            [
+                'sfdisk', '--no-reread', '--no-tell-kernel',
+                '/dev/loop0'
+            ], stdin='label: dos\ntype=83\n'
         )
 
-        m_open = mock_open()
-        with patch('builtins.open', m_open, create=True):
-            self.partitioner.create('name', 'all_free', 't.linux')
+    @patch('kiwi.partitioner.msdos.Command.run')
+    def test_create_invalid_flag(self, mock_command):
+        with raises(KiwiPartitionerMsDosFlagError):
+            self.partitioner.create('name', 100, 't.linux', ['foo'])
 
-        m_open.return_value.write.assert_called_once_with(
-            'n\np\n1\n\n\nw\nq\n'
-        )
+    @patch('kiwi.partitioner.msdos.Command.run')
+    def test_create_flag_ignored(self, mock_command):
+        with self._caplog.at_level(logging.WARNING):
+            self.partitioner.create('name', 100, 't.linux', ['t.csm'])
+        assert 'Flag t.csm ignored on msdos' in self._caplog.text
 
     def test_set_flag_invalid(self):
         with raises(KiwiPartitionerMsDosFlagError):
@@ -211,14 +172,35 @@ class TestPartitionerMsDos:
     def test_set_flag(self, mock_command):
         self.partitioner.set_flag(1, 't.linux')
         mock_command.assert_called_once_with(
-            ['sfdisk', '-c', '/dev/loop0', '1', '83']
+            ['sfdisk', '--part-type', '/dev/loop0', '1', '83']
         )
 
     @patch('kiwi.partitioner.msdos.Command.run')
     def test_set_active(self, mock_command):
         self.partitioner.set_flag(1, 'f.active')
         mock_command.assert_called_once_with(
-            ['parted', '/dev/loop0', 'set', '1', 'boot', 'on']
+            ['sfdisk', '--activate', '/dev/loop0', '1']
+        )
+
+    @patch('kiwi.partitioner.msdos.Command.run')
+    def test_commit_batches_activations(self, mock_command):
+        self.partitioner._pending_flags = [
+            (1, 'f.active'), (2, 't.linux'), (3, 'f.active')
+        ]
+        self.partitioner.commit()
+        assert mock_command.call_args_list == [
+            call(['sfdisk', '--part-type', '/dev/loop0', '2', '83']),
+            call(['sfdisk', '--activate', '/dev/loop0', '1', '3'])
+        ]
+        assert self.partitioner._pending_flags == []
+
+    @patch('kiwi.partitioner.msdos.Command.run')
+    def test_set_active_keeps_created_activations(self, mock_command):
+        self.partitioner.create('name', 100, 't.linux', ['f.active'])
+        mock_command.reset_mock()
+        self.partitioner.set_flag(2, 'f.active')
+        mock_command.assert_called_once_with(
+            ['sfdisk', '--activate', '/dev/loop0', '1', '2']
         )
 
     def test_set_flag_ignored(self):
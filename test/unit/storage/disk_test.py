@@ -1,6 +1,6 @@
 import logging
 from mock import (
-    patch, mock_open, call
+    patch, call
 )
 from pytest import (
     fixture, raises
@@ -20,9 +20,6 @@ class TestDisk:
 
     @patch('kiwi.storage.disk.Partitioner.new')
     def setup(self, mock_partitioner):
-        self.tempfile = mock.Mock()
-        self.tempfile.name = 'tempfile'
-
         self.partitioner = mock.Mock()
         self.partitioner.create = mock.Mock()
         self.partitioner.get_id = mock.Mock(
@@ -248,22 +245,13 @@ class TestDisk:
         )
 
     @patch('kiwi.storage.disk.Command.run')
-    @patch('kiwi.storage.disk.Temporary.new_file')
-    def test_wipe_dasd(self, mock_temp, mock_command):
+    def test_wipe_dasd(self, mock_command):
         mock_command.side_effect = Exception
         self.disk.table_type = 'dasd'
-        mock_temp.return_value = self.tempfile
-
-        m_open = mock_open()
-        with patch('builtins.open', m_open, create=True):
-            self.disk.wipe()
-
-        m_open.return_value.write.assert_called_once_with(
-            'y\n\nw\nq\n'
-        )
         with self._caplog.at_level(logging.DEBUG):
+            self.disk.wipe()
             mock_command.assert_called_once_with(
-                ['bash', '-c', 'cat tempfile | fdasd -f /dev/loop0']
+                ['fdasd', '-f', '/dev/loop0'], stdin='y\n\nw\nq\n'
             )
 
     @patch('kiwi.storage.disk.Command.run')
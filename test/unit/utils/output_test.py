@@ -4,6 +4,7 @@ from mock import patch
 from kiwi.utils.output import DataOutput
 import json
 import mock
+import subprocess
 
 
 class TestDataOutput:
@@ -37,17 +38,18 @@ class TestDataOutput:
                 file_handle.read.assert_called_once_with()
 
     @patch('sys.stdout')
-    @patch('os.system')
-    @patch('kiwi.utils.output.Temporary.new_file')
-    def test_display_color(self, mock_temp, mock_system, mock_stdout):
-        out_file = mock.Mock()
-        out_file.name = 'tmpfile'
-        mock_temp.return_value = out_file
+    @patch('subprocess.Popen')
+    def test_display_color(self, mock_popen, mock_stdout):
+        pjson = mock.Mock()
+        mock_popen.return_value = pjson
         self.out.style = 'color'
         self.out.color_json = True
         self.out.display()
-        mock_system.assert_called_once_with(
-            'cat tmpfile | pjson'
+        mock_popen.assert_called_once_with(
+            ['pjson'], stdin=subprocess.PIPE
+        )
+        pjson.communicate.assert_called_once_with(
+            json.dumps({'some-name': 'some-data'}, sort_keys=True).encode()
         )
 
     @patch('sys.stdout')